@@ -6,19 +6,99 @@ Fetches clone traffic data for all repos listed in ASI Ecosystem
 Requires GITHUB_TOKEN or TRAFFIC_TRACKER environment variable with repo access
 """
 
+import asyncio
+import functools
 import os
 import json
-import re
 import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timezone
+from operator import itemgetter
 from pathlib import Path
+import aiohttp
 import requests
-from github import Github, GithubException
+from requests.adapters import HTTPAdapter, Retry
+from github import Github
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
 # Configuration
 ECOSYSTEM_README_URL = "https://raw.githubusercontent.com/ronniross/asi-ecosystem/main/README.md"
+GITHUB_API_URL = "https://api.github.com"
 BASE_DIR = Path("repos")
 GLOBAL_SUMMARY_FILE = Path("global-summary.json")
+README_CACHE_FILE = Path("readme-cache.json")
+MAX_CONCURRENT_REQUESTS = 8  # modest ceiling to stay clear of secondary rate limits
+MAX_RETRIES = 5
+
+# Marker for GitHub repo URLs inside markdown links
+_REPO_LINK_PREFIX = '](https://github.com/'
+
+# Shared session: keep-alive avoids a TCP+TLS handshake per request and
+# retries transient failures with backoff
+_SESSION = requests.Session()
+_SESSION.mount('https://', HTTPAdapter(
+    pool_connections=16,
+    pool_maxsize=16,
+    max_retries=Retry(total=3, backoff_factor=0.5, status_forcelist=[429, 502, 503, 504])
+))
+
+def _json_loads(data):
+    """Parse JSON bytes, using orjson when available"""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+def _json_dumps(obj):
+    """Encode to indented JSON bytes, using orjson when available"""
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2)
+    return json.dumps(obj, indent=2).encode()
+
+def _json_dumps_line(obj):
+    """Encode to one compact JSON line (no trailing newline) for JSONL files"""
+    if orjson is not None:
+        return orjson.dumps(obj)
+    return json.dumps(obj, separators=(',', ':')).encode()
+
+def _atomic_write(path, data):
+    """Write bytes to path atomically: temp file then os.replace (POSIX rename)
+
+    A crash mid-write leaves the old file intact instead of a truncated one.
+    """
+    path = Path(path)
+    tmp = path.with_suffix(path.suffix + '.tmp')
+    tmp.write_bytes(data)
+    os.replace(tmp, path)
+
+class GitHubLimiter:
+    """Gate requests on GitHub's rate-limit headers, shared by all coroutines"""
+
+    def __init__(self):
+        self._ready = asyncio.Event()
+        self._ready.set()
+
+    async def wait(self):
+        """Block until the rate-limit window allows more requests"""
+        await self._ready.wait()
+
+    def update(self, headers):
+        """Pause all requests until reset when the remaining quota runs low"""
+        remaining = headers.get('X-RateLimit-Remaining')
+        if remaining is None or int(remaining) >= 5 or not self._ready.is_set():
+            return
+        reset = headers.get('X-RateLimit-Reset')
+        delay = max(0.0, int(reset) - time.time()) if reset else 60.0
+        self._ready.clear()
+        asyncio.get_running_loop().create_task(self._resume_after(delay))
+
+    async def _resume_after(self, delay):
+        await asyncio.sleep(delay)
+        self._ready.set()
 
 def get_github_token():
     """Get GitHub token from environment"""
@@ -28,158 +108,277 @@ def get_github_token():
         sys.exit(1)
     return token
 
+def _load_readme_cache():
+    """Load the cached README ETag and repo list; returns None if unusable"""
+    try:
+        with open(README_CACHE_FILE, 'rb') as f:
+            cache = _json_loads(f.read())
+        if cache.get('etag') and isinstance(cache.get('repos'), list):
+            return cache
+    except Exception:
+        pass
+    return None
+
 def fetch_ecosystem_repos():
     """Fetch and parse the ASI Ecosystem README to extract repo URLs"""
     print(f"ðŸ“¥ Fetching ASI Ecosystem README from: {ECOSYSTEM_README_URL}")
+    cache = _load_readme_cache()
+    headers = {'If-None-Match': cache['etag']} if cache else {}
     try:
-        response = requests.get(ECOSYSTEM_README_URL, timeout=10)
+        response = _SESSION.get(ECOSYSTEM_README_URL, headers=headers, timeout=10)
+        if response.status_code == 304:
+            # README unchanged since last run - reuse the cached repo list
+            repos = cache['repos']
+            print(f" Found {len(repos)} unique repositories to track (cached)")
+            return repos
         response.raise_for_status()
     except requests.RequestException as e:
         print(f" Failed to download README: {e}")
         sys.exit(1)
-    
+
     content = response.text
-    
-    # Extract GitHub repo URLs from markdown links
-    pattern = r'\[([^\]]+)\]\(https://github\.com/([^/]+)/([^/)]+)\)'
-    matches = re.findall(pattern, content)
-    
-    repos = []
-    seen = set()
-    for match in matches:
-        owner = match[1]
-        repo_name = match[2].split('?')[0].split('#')[0] # Clean URL params
-        full_name = f"{owner}/{repo_name}"
-        
-        if full_name not in seen:
-            repos.append(full_name)
-            seen.add(full_name)
-    
+
+    # Cheap single-pass guard before scanning for links at all
+    if 'github.com/' not in content:
+        print(" Found 0 unique repositories to track")
+        return []
+
+    # Extract GitHub repo URLs from markdown links with a single str.find scan.
+    # Like a DFA regex engine (e.g. re2) this is guaranteed linear in the
+    # README size, but without pulling in a regex dependency at all.
+    found = set()
+    pos = 0
+    while True:
+        i = content.find(_REPO_LINK_PREFIX, pos)
+        if i < 0:
+            break
+        j = content.find(')', i)
+        if j < 0:
+            break
+        pos = j + 1
+
+        slug = content[i + len(_REPO_LINK_PREFIX):j]
+        owner, _, repo_name = slug.partition('/')
+        repo_name = repo_name.partition('?')[0].partition('#')[0] # Clean URL params
+        if not owner or not repo_name or '/' in repo_name:
+            continue # Link to a file/issue/etc., not a repo
+        found.add(f"{owner}/{repo_name}")
+
+    repos = sorted(found)
+
+    etag = response.headers.get('ETag')
+    if etag:
+        _atomic_write(README_CACHE_FILE, _json_dumps({'etag': etag, 'repos': repos}))
+
     print(f" Found {len(repos)} unique repositories to track")
     return repos
 
+@functools.lru_cache(maxsize=1)
 def get_today_filename():
-    """Generate filename for today's run"""
+    """Generate filename for today's run (computed once per process)"""
     now = datetime.now(timezone.utc)
     return f"{now.strftime('%Y-%m-%d')}.json"
 
-def check_if_already_ran_today(repo_dir):
-    """Check if stats were already collected today"""
-    runs_dir = repo_dir / "runs"
-    today_file = runs_dir / get_today_filename()
-    return today_file.exists()
-
-def fetch_clone_traffic(gh, repo_full_name):
-    """Fetch clone traffic data from GitHub API"""
+async def fetch_clone_traffic(session, sem, limiter, repo_full_name):
+    """Fetch clone traffic data for one repo from the GitHub API"""
+    url = f"{GITHUB_API_URL}/repos/{repo_full_name}/traffic/clones"
     try:
-        repo = gh.get_repo(repo_full_name)
+        traffic = None
+        for attempt in range(MAX_RETRIES):
+            await limiter.wait()
+            async with sem:
+                async with session.get(url) as response:
+                    limiter.update(response.headers)
+                    if response.status in (403, 429):
+                        retry_after = response.headers.get('Retry-After')
+                        rate_limited = retry_after is not None or \
+                            response.headers.get('X-RateLimit-Remaining') == '0'
+                        if rate_limited:
+                            delay = int(retry_after) if retry_after else min(60, 2 ** attempt)
+                            await asyncio.sleep(delay)
+                            continue
+                        print(f"   Access Denied (403): Check TRAFFIC_TRACKER permissions for {repo_full_name}")
+                        return None
+                    if response.status == 404:
+                        print(f"   Repo not found (404): {repo_full_name}")
+                        return None
+                    if response.status != 200:
+                        print(f"   GitHub API Error ({response.status}): {repo_full_name}")
+                        return None
+                    traffic = await response.json()
+                    break
+        else:
+            print(f"   Rate limited after {MAX_RETRIES} attempts: {repo_full_name}")
+            return None
+
         # Note: You need Push access to the target repo to read traffic stats
-        traffic = repo.get_clones_traffic()
-        
         if traffic.get('clones'):
             latest = traffic['clones'][-1]
             return {
-                'timestamp': latest.timestamp.isoformat(),
-                'count': latest.count,
-                'uniques': latest.uniques
+                'timestamp': latest['timestamp'],
+                'count': latest['count'],
+                'uniques': latest['uniques']
             }
         return None
-    except GithubException as e:
-        if e.status == 403:
-            print(f"   Access Denied (403): Check TRAFFIC_TRACKER permissions for {repo_full_name}")
-        elif e.status == 404:
-            print(f"   Repo not found (404): {repo_full_name}")
-        else:
-            print(f"   GitHub API Error: {e}")
-        return None
     except Exception as e:
         print(f"   Unexpected Error fetching {repo_full_name}: {e}")
         return None
 
-def save_daily_run(repo_dir, data):
+async def fetch_all_clone_traffic(token, repo_full_names):
+    """Fetch clone traffic for all repos concurrently, bounded by a semaphore"""
+    sem = asyncio.Semaphore(MAX_CONCURRENT_REQUESTS)
+    limiter = GitHubLimiter()
+    connector = aiohttp.TCPConnector(limit_per_host=64)
+    headers = {
+        'Authorization': f'Bearer {token}',
+        'Accept': 'application/vnd.github+json',
+        'X-GitHub-Api-Version': '2022-11-28'
+    }
+    async with aiohttp.ClientSession(connector=connector, headers=headers) as session:
+        results = await asyncio.gather(
+            *(fetch_clone_traffic(session, sem, limiter, name) for name in repo_full_names)
+        )
+    return dict(zip(repo_full_names, results))
+
+def save_daily_run(repo_dir, data, today_filename):
     """Save today's statistics to a new run file"""
     runs_dir = repo_dir / "runs"
     runs_dir.mkdir(parents=True, exist_ok=True)
-    
-    today_file = runs_dir / get_today_filename()
-    
-    with open(today_file, 'w') as f:
-        json.dump(data, f, indent=2)
-    
+
+    today_file = runs_dir / today_filename
+
+    _atomic_write(today_file, _json_dumps(data))
+
     print(f"   Saved: {today_file}")
 
-def update_repo_summary(repo_dir, repo_name):
-    """Update the summary.json for a specific repo"""
-    runs_dir = repo_dir / "runs"
+def _append_history(repo_dir, entries, mode='ab'):
+    """Append daily entries to the repo's history.jsonl (one JSON object per line)"""
+    history_file = repo_dir / "history.jsonl"
+    with open(history_file, mode) as f:
+        for entry in entries:
+            f.write(_json_dumps_line(entry) + b'\n')
+
+def update_repo_summary(repo_dir, repo_name, new_entry, run_timestamp):
+    """Update the summary for a specific repo
+
+    The daily history lives in an append-only history.jsonl, so the normal
+    path appends one line there and rewrites only the small scalar
+    summary.json. The full re-scan of runs/ only happens when summary.json
+    is missing or corrupt.
+    """
     summary_file = repo_dir / "summary.json"
-    
+
+    summary = None
+    if summary_file.exists():
+        try:
+            with open(summary_file, 'rb') as f:
+                summary = _json_loads(f.read())
+        except json.JSONDecodeError:
+            print(f"   Warning: Corrupt JSON file {summary_file} - rebuilding")
+
+    if summary is not None:
+        # Migrate the old embedded history to history.jsonl on first contact
+        old_history = summary.pop('daily_history', None)
+        if old_history is not None:
+            _append_history(repo_dir, old_history, mode='wb')
+
+        _append_history(repo_dir, [new_entry])
+        summary['last_updated'] = run_timestamp
+        summary['total_days_tracked'] = summary.get('total_days_tracked', 0) + 1
+        summary['total_clones'] += new_entry['clones']
+        summary['max_unique_cloners_in_window'] = max(
+            summary.get('max_unique_cloners_in_window', 0),
+            new_entry['unique_cloners']
+        )
+        if not summary.get('first_tracked'):
+            summary['first_tracked'] = new_entry['date']
+        summary['last_tracked'] = new_entry['date']
+    else:
+        summary = rebuild_repo_summary(repo_dir, repo_name, run_timestamp)
+
+    _atomic_write(summary_file, _json_dumps(summary))
+
+    return summary
+
+def rebuild_repo_summary(repo_dir, repo_name, run_timestamp):
+    """Rebuild a repo summary and history.jsonl by re-scanning all run files"""
+    runs_dir = repo_dir / "runs"
+
     all_runs = []
-    unique_cloners_set = set()
+    max_unique_cloners = 0
     total_clones = 0
     
     if runs_dir.exists():
-        for run_file in sorted(runs_dir.glob("*.json")):
+        # ISO-8601 date filenames make lexicographic order chronological
+        for name in sorted(n for n in os.listdir(runs_dir) if n.endswith('.json')):
+            run_file = os.path.join(runs_dir, name)
             try:
-                with open(run_file, 'r') as f:
-                    run_data = json.load(f)
+                with open(run_file, 'rb') as f:
+                    run_data = _json_loads(f.read())
                     all_runs.append({
-                        'date': run_file.stem,
+                        'date': name[:-len('.json')],
                         'clones': run_data.get('count', 0),
                         'unique_cloners': run_data.get('uniques', 0)
                     })
                     total_clones += run_data.get('count', 0)
-                    unique_cloners_set.add(run_data.get('uniques', 0))
+                    max_unique_cloners = max(max_unique_cloners, run_data.get('uniques', 0))
             except json.JSONDecodeError:
                 print(f"   Warning: Corrupt JSON file {run_file}")
     
+    _append_history(repo_dir, all_runs, mode='wb')
+
     summary = {
         'repo_name': repo_name,
-        'last_updated': datetime.now(timezone.utc).isoformat(),
+        'last_updated': run_timestamp,
         'total_days_tracked': len(all_runs),
         'total_clones': total_clones,
-        'max_unique_cloners_in_window': max(unique_cloners_set) if unique_cloners_set else 0,
+        'max_unique_cloners_in_window': max_unique_cloners,
         'first_tracked': all_runs[0]['date'] if all_runs else None,
-        'last_tracked': all_runs[-1]['date'] if all_runs else None,
-        'daily_history': all_runs
+        'last_tracked': all_runs[-1]['date'] if all_runs else None
     }
-    
-    with open(summary_file, 'w') as f:
-        json.dump(summary, f, indent=2)
-    
+
     return summary
 
-def update_global_summary():
+def _load_summary(summary_file):
+    """Read one summary.json; returns None if missing or unreadable"""
+    try:
+        with open(summary_file, 'rb') as f:
+            return _json_loads(f.read())
+    except Exception:
+        return None
+
+def update_global_summary(run_timestamp):
     """Update the global summary across all repos"""
     print("\nðŸŒŽ Updating global summary...")
-    
+
     all_repo_summaries = []
     total_clones_global = 0
     total_repos = 0
-    
+
     if BASE_DIR.exists():
-        for repo_dir in BASE_DIR.iterdir():
-            if repo_dir.is_dir():
-                summary_file = repo_dir / "summary.json"
-                if summary_file.exists():
-                    try:
-                        with open(summary_file, 'r') as f:
-                            summary = json.load(f)
-                            all_repo_summaries.append(summary)
-                            total_clones_global += summary.get('total_clones', 0)
-                            total_repos += 1
-                    except Exception:
-                        continue
-    
+        # scandir serves is_dir() from the directory read, no stat per entry
+        with os.scandir(BASE_DIR) as it:
+            summary_files = [os.path.join(entry.path, "summary.json")
+                             for entry in it if entry.is_dir(follow_symlinks=False)]
+        # Parallel reads overlap the per-file I/O; the write below stays single-threaded
+        with ThreadPoolExecutor(max_workers=32) as executor:
+            for summary in executor.map(_load_summary, summary_files):
+                if summary is None:
+                    continue
+                all_repo_summaries.append(summary)
+                total_clones_global += summary.get('total_clones', 0)
+                total_repos += 1
+
     global_summary = {
-        'last_updated': datetime.now(timezone.utc).isoformat(),
+        'last_updated': run_timestamp,
         'total_repos_tracked': total_repos,
         'total_clones_all_repos': total_clones_global,
-        'repositories': sorted(all_repo_summaries, key=lambda x: x.get('total_clones', 0), reverse=True)
+        # update_repo_summary always writes total_clones, so no .get default needed
+        'repositories': sorted(all_repo_summaries, key=itemgetter('total_clones'), reverse=True)
     }
     
-    with open(GLOBAL_SUMMARY_FILE, 'w') as f:
-        json.dump(global_summary, f, indent=2)
-    
+    _atomic_write(GLOBAL_SUMMARY_FILE, _json_dumps(global_summary))
+
     print(f" Global summary updated: {GLOBAL_SUMMARY_FILE}")
     print(f"   Tracked {total_repos} repos with {total_clones_global} total clones")
 
@@ -203,37 +402,58 @@ def main():
     repos_to_track = fetch_ecosystem_repos()
     
     print(f"\n Processing {len(repos_to_track)} repositories...\n")
-    
+
+    # One timestamp for the whole run: avoids per-repo clock reads and keeps
+    # a run that crosses midnight UTC from splitting into two date files
+    run_timestamp = datetime.now(timezone.utc).isoformat()
+    today_filename = get_today_filename()
+    today_date = today_filename[:-len('.json')]
+
     stats_collected = 0
     stats_skipped = 0
-    
+
+    # One directory walk instead of a stat() per repo
+    done_today = {p.parent.parent.name for p in BASE_DIR.glob(f"*/runs/{today_filename}")}
+
+    # Check which repos still need collecting today
+    repos_to_fetch = []
     for repo_full_name in repos_to_track:
-        print(f" {repo_full_name}")
-        
-        # Create repo directory
         repo_safe_name = repo_full_name.replace('/', '_')
-        repo_dir = BASE_DIR / repo_safe_name
-        
-        # Check if already ran today
-        if check_if_already_ran_today(repo_dir):
+
+        if repo_safe_name in done_today:
+            print(f" {repo_full_name}")
             print(f"    Already collected today - skipping")
             stats_skipped += 1
-            continue
-        
-        # Fetch clone traffic
-        clone_data = fetch_clone_traffic(gh, repo_full_name)
-        
+        else:
+            repos_to_fetch.append(repo_full_name)
+
+    # Fetch clone traffic for all remaining repos concurrently
+    clone_results = asyncio.run(fetch_all_clone_traffic(token, repos_to_fetch))
+
+    for repo_full_name in repos_to_fetch:
+        print(f" {repo_full_name}")
+
+        repo_safe_name = repo_full_name.replace('/', '_')
+        repo_dir = BASE_DIR / repo_safe_name
+
+        clone_data = clone_results[repo_full_name]
+
         if clone_data:
             clone_data['repo'] = repo_full_name
-            clone_data['collected_at'] = datetime.now(timezone.utc).isoformat()
-            
-            save_daily_run(repo_dir, clone_data)
-            update_repo_summary(repo_dir, repo_full_name)
+            clone_data['collected_at'] = run_timestamp
+
+            save_daily_run(repo_dir, clone_data, today_filename)
+            new_entry = {
+                'date': today_date,
+                'clones': clone_data['count'],
+                'unique_cloners': clone_data['uniques']
+            }
+            update_repo_summary(repo_dir, repo_full_name, new_entry, run_timestamp)
             stats_collected += 1
         else:
             print(f"   No data available or access denied")
-        
-    update_global_summary()
+
+    update_global_summary(run_timestamp)
     
     print(f"\n Collection complete!")
     print(f"   New stats collected: {stats_collected}")
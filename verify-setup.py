@@ -7,8 +7,18 @@ Run this to check if everything is configured correctly
 import os
 import sys
 import requests
+from concurrent.futures import ThreadPoolExecutor
+from requests.adapters import HTTPAdapter, Retry
 from pathlib import Path
 
+# Session with keep-alive and retry on transient failures, matching collect_stats
+_SESSION = requests.Session()
+_SESSION.mount('https://', HTTPAdapter(
+    pool_connections=16,
+    pool_maxsize=16,
+    max_retries=Retry(total=3, backoff_factor=0.5, status_forcelist=[429, 502, 503, 504])
+))
+
 def check_token():
     """Check if GitHub token is available"""
     token = os.environ.get('GITHUB_TOKEN') or os.environ.get('TRAFFIC_TRACKER')
@@ -36,7 +46,7 @@ def check_ecosystem_access():
     """Check if we can access the ecosystem README"""
     url = "https://raw.githubusercontent.com/ronniross/asi-ecosystem/main/README.md"
     try:
-        response = requests.get(url)
+        response = _SESSION.get(url, timeout=10)
         response.raise_for_status()
         print(" Can access ASI Ecosystem README")
         print(f"   Found {len(response.text)} characters")
@@ -67,13 +77,17 @@ def check_directory_structure():
 def main():
     print("🔍 Checking ecosystem-clone-statistics setup...\n")
     
-    checks = [
-        ("Dependencies", check_dependencies()),
-        ("GitHub Token", check_token()),
-        ("Ecosystem Access", check_ecosystem_access()),
-        ("File Structure", check_directory_structure()),
+    # The checks are independent, so overlap the slow HTTPS one with the rest
+    check_fns = [
+        ("Dependencies", check_dependencies),
+        ("GitHub Token", check_token),
+        ("Ecosystem Access", check_ecosystem_access),
+        ("File Structure", check_directory_structure),
     ]
-    
+    with ThreadPoolExecutor(max_workers=len(check_fns)) as executor:
+        futures = {name: executor.submit(fn) for name, fn in check_fns}
+        checks = [(name, futures[name].result()) for name, _ in check_fns]
+
     print("\n" + "="*50)
     all_passed = all(result for _, result in checks)
     